@@ -13,11 +13,10 @@ Usage:
     uv run python scripts/build_plugin.py
 """
 
+import re
 from pathlib import Path
 from typing import Any
 
-import yaml
-
 from sensei.prompts import Context, build_prompt
 
 # Paths relative to repo root
@@ -82,17 +81,145 @@ OUTPUTS: list[dict[str, Any]] = [
 ]
 
 
-def build_frontmatter(data: dict[str, Any]) -> str:
+# Frontmatter is a flat mapping of str -> str, so it is emitted by hand instead
+# of going through a YAML library. For prose values the output matches what
+# yaml.dump(default_flow_style=False, width=80) produces for the same input.
+YAML_WIDTH = 80
+YAML_INDENT = "  "
+_YAML_TOKEN = re.compile(r" +|\n+|[^ \n]+")
+_YAML_INDICATORS = set("-?:,[]{}#&*!|>'\"%@`")
+
+# Plain scalars that a YAML 1.1 loader (PyYAML's safe_load) would resolve to
+# something other than str: bool, null, int, float, timestamp, merge, value
+_YAML_IMPLICIT = re.compile(
+    r"""^(?:
+        yes|Yes|YES|no|No|NO|true|True|TRUE|false|False|FALSE|on|On|ON|off|Off|OFF
+      | ~|null|Null|NULL
+      | [-+]?0b[0-1_]+
+      | [-+]?0[0-7_]+
+      | [-+]?(?:0|[1-9][0-9_]*)
+      | [-+]?0x[0-9a-fA-F_]+
+      | [-+]?[1-9][0-9_]*(?::[0-5]?[0-9])+
+      | [-+]?(?:[0-9][0-9_]*)\.[0-9_]*(?:[eE][-+][0-9]+)?
+      | \.[0-9][0-9_]*(?:[eE][-+][0-9]+)?
+      | [-+]?[0-9][0-9_]*(?::[0-5]?[0-9])+\.[0-9_]*
+      | [-+]?\.(?:inf|Inf|INF)
+      | \.(?:nan|NaN|NAN)
+      | [0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]
+      | [0-9][0-9][0-9][0-9]-[0-9][0-9]?-[0-9][0-9]?
+        (?:[Tt]|[\ \t]+)[0-9][0-9]?:[0-9][0-9]:[0-9][0-9](?:\.[0-9]*)?
+        (?:[\ \t]*(?:Z|[-+][0-9][0-9]?(?::[0-9][0-9])?))?
+      | <<
+      | =
+    )$""",
+    re.VERBOSE,
+)
+
+# Whitespace that single-quoted folding would drop: spaces or tabs next to a
+# line break, and tabs next to a space or at either end of the value
+_YAML_BREAK_WHITESPACE = re.compile(r"[ \t]\n|\n[ \t]| \t|\t |^\t|\t$")
+
+
+def _yaml_needs_quotes(value: str) -> bool:
+    """Check whether a string can't be written as a plain YAML scalar."""
+    return (
+        not value
+        or value[0] in _YAML_INDICATORS
+        or value[0] == " "
+        or value[-1] == " "
+        or value[-1] == ":"
+        or "\n" in value
+        or "\t" in value
+        or ": " in value
+        or " #" in value
+        or _YAML_IMPLICIT.match(value) is not None
+    )
+
+
+def _yaml_needs_escapes(value: str) -> bool:
+    """Check whether a string needs a double-quoted scalar to survive loading.
+
+    Single-quoted scalars trim spaces and tabs around line breaks and can't
+    hold non-printable characters (YAML also treats U+0085, U+2028 and U+2029
+    as line breaks).
+    """
+    if _YAML_BREAK_WHITESPACE.search(value):
+        return True
+    return not value.replace("\n", "").replace("\t", "").isprintable()
+
+
+def _yaml_double_quoted(value: str) -> str:
+    """Emit a double-quoted scalar on one line, escaping what YAML requires."""
+    parts = ['"']
+    for char in value:
+        if char in '"\\':
+            parts.append("\\" + char)
+        elif char == "\n":
+            parts.append("\\n")
+        elif char == "\t":
+            parts.append("\\t")
+        elif char.isprintable():
+            parts.append(char)
+        elif (code := ord(char)) < 0x100:
+            parts.append(f"\\x{code:02X}")
+        elif code < 0x10000:
+            parts.append(f"\\u{code:04X}")
+        else:
+            parts.append(f"\\U{code:08X}")
+    parts.append('"')
+    return "".join(parts)
+
+
+def _yaml_str(value: str, column: int) -> str:
+    """Emit a string scalar, folding at single spaces past YAML_WIDTH.
+
+    Values that can't be plain are single-quoted; inside quotes a run of n
+    newlines is written as n + 1 line breaks, which YAML folds back to n.
+    Values whose whitespace or characters single quotes can't preserve fall
+    back to an unfolded double-quoted scalar.
+    """
+    if _yaml_needs_escapes(value):
+        return _yaml_double_quoted(value)
+
+    quoted = _yaml_needs_quotes(value)
+    tokens = _YAML_TOKEN.findall(value)
+    last = len(tokens) - 1
+    parts = ["'"] if quoted else []
+    column += len(parts)
+
+    for i, token in enumerate(tokens):
+        if token[0] == " ":
+            if token == " " and column > YAML_WIDTH and (not quoted or 0 < i < last):
+                parts.append("\n" + YAML_INDENT)
+                column = len(YAML_INDENT)
+            else:
+                parts.append(token)
+                column += len(token)
+        elif token[0] == "\n":
+            parts.append("\n" * (len(token) + 1) + YAML_INDENT)
+            column = len(YAML_INDENT)
+        else:
+            if quoted:
+                token = token.replace("'", "''")
+            parts.append(token)
+            column += len(token)
+
+    if quoted:
+        parts.append("'")
+    return "".join(parts)
+
+
+def build_frontmatter(data: dict[str, str]) -> str:
     """Convert frontmatter dict to YAML string."""
-    # Use block style for multi-line strings
-    yaml_str = yaml.dump(data, default_flow_style=False, allow_unicode=True, width=80)
-    return f"---\n{yaml_str}---\n\n"
+    lines = [f"{key}: {_yaml_str(data[key], len(key) + 2)}" for key in sorted(data)]
+    return "---\n" + "\n".join(lines) + "\n---\n\n"
 
 
 def main() -> None:
     """Generate plugin files from prompts.py."""
     print("Building Claude Code plugin...\n")
 
+    created_dirs: set[Path] = set()
     for output in OUTPUTS:
         context: Context = output["context"]
         rel_path: str = output["path"]
@@ -104,8 +231,10 @@ def main() -> None:
 
         # Write file
         path = PLUGIN_DIR / rel_path
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(content)
+        if path.parent not in created_dirs:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            created_dirs.add(path.parent)
+        path.write_bytes(content.encode("utf-8"))
 
         # Report
         print(f"Generated {path.relative_to(REPO_ROOT)}")
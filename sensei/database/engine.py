@@ -11,10 +11,15 @@ from sensei.settings import sensei_settings
 engine = create_async_engine(
     sensei_settings.database_url,
     echo=False,
-    future=True,
     pool_pre_ping=True,
-    pool_size=5,
+    # Sized to the crawler's max_concurrency so steady-state crawls reuse
+    # pooled connections instead of opening and closing overflow ones
+    pool_size=10,
     max_overflow=10,
+    # The asyncpg dialect prepares each statement once per connection and
+    # reuses it from this LRU; leave headroom over the fixed-shape storage
+    # statements plus the per-filter variants of search_sections_fts
+    connect_args={"prepared_statement_cache_size": 512},
 )
 
 async_session_factory = async_sessionmaker(
@@ -11,13 +11,15 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
     func,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
-from sqlalchemy.orm import declarative_base, declared_attr
+from sqlalchemy.orm import declarative_base, declared_attr, deferred
 
 
 class TimestampMixin:
@@ -57,10 +59,13 @@ class Query(TimestampMixin, Base):
     output = Column(Text, nullable=False)  # Final text output from agent
     messages = Column(JSONB, nullable=True)  # All intermediate messages (tool calls, results)
     # Full-text search vector for efficient cache search
-    query_tsvector = Column(
-        TSVECTOR,
-        Computed("to_tsvector('english', query)", persisted=True),
-        nullable=True,
+    # Deferred: only used in SQL predicates, never worth shipping to Python
+    query_tsvector = deferred(
+        Column(
+            TSVECTOR,
+            Computed("to_tsvector('english', query)", persisted=True),
+            nullable=True,
+        )
     )
 
     __table_args__ = (Index("ix_queries_query_tsvector", "query_tsvector", postgresql_using="gin"),)
@@ -109,7 +114,7 @@ class Document(TimestampMixin, Base):
     domain = Column(String, nullable=False, index=True)  # e.g. "llmstext.org"
     url = Column(String, nullable=False, index=True)  # Full URL (unique per generation)
     path = Column(String, nullable=False)  # e.g. "/docs/hooks/useState.md"
-    content_hash = Column(String, nullable=False)  # For change detection on upsert
+    content_hash = Column(LargeBinary, nullable=False)  # Raw digest bytes, for change detection on upsert
     content_refreshed_at = Column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )  # When content was last refreshed
@@ -117,7 +122,18 @@ class Document(TimestampMixin, Base):
     generation_id = Column(UUID(as_uuid=True), nullable=False)  # Groups docs from same crawl
     generation_active = Column(Boolean, nullable=False, server_default="false")  # Only active docs visible to queries
 
-    __table_args__ = (UniqueConstraint("url", "generation_id", name="documents_url_generation_key"),)
+    __table_args__ = (
+        UniqueConstraint("url", "generation_id", name="documents_url_generation_key"),
+        # Reads only ever see the active generation; index just that subset,
+        # with covering columns so domain-scoped reads skip the heap entirely
+        Index(
+            "idx_documents_domain_path_active",
+            "domain",
+            "path",
+            postgresql_include=["id", "url"],
+            postgresql_where=text("generation_active = true"),
+        ),
+    )
 
 
 class Section(TimestampMixin, Base):
@@ -154,10 +170,13 @@ class Section(TimestampMixin, Base):
     # Populated at crawl time from ancestor traversal, avoids recursive CTE on search
     heading_path = Column(String, nullable=True)
     # Full-text search vector - computed by PostgreSQL on section content
-    content_tsvector = Column(
-        TSVECTOR,
-        Computed("to_tsvector('english', content)", persisted=True),
-        nullable=True,
+    # Deferred: only used in SQL predicates, never worth shipping to Python
+    content_tsvector = deferred(
+        Column(
+            TSVECTOR,
+            Computed("to_tsvector('english', content)", persisted=True),
+            nullable=True,
+        )
     )
 
     __table_args__ = (Index("ix_sections_content_tsvector", "content_tsvector", postgresql_using="gin"),)
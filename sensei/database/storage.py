@@ -1,29 +1,131 @@
 """Database operations for Sensei using SQLAlchemy with async PostgreSQL."""
 
 import logging
-from typing import Optional
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
 from uuid import UUID
 
-from sqlalchemy import Integer, delete, func, select, text
+from sqlalchemy import Integer, String, bindparam, delete, func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
 from sensei.database.engine import get_session_factory
 from sensei.database.models import Document, Query, Section
 from sensei.database.models import Rating as RatingModel
-from sensei.types import CacheHit, Rating, SearchResult
+from sensei.types import CacheHit, DocumentRecord, QueryContent, Rating, SearchResult
 
 logger = logging.getLogger(__name__)
 
+# Rows per transaction for bulk document inserts
+DOCUMENT_BATCH_SIZE = 500
+
+# Documents physically deleted per transaction by cleanup_old_generations
+CLEANUP_BATCH_SIZE = 1000
+
+# Fixed-shape hot statements are built once at import and executed with bind
+# values, so each call skips statement construction and reuses the cached
+# compiled form (and asyncpg's prepared statement on the connection).
+_search_tsquery = func.websearch_to_tsquery("english", bindparam("query", type_=String))
+# Selects plain columns named after the CacheHit fields rather than the Query
+# entity, so rows skip ORM loading and the identity map
+_SEARCH_QUERIES_STMT = (
+    select(
+        Query.id,
+        Query.query,
+        Query.language,
+        Query.library,
+        Query.version,
+        Query.output,
+        Query.messages,
+        Query.inserted_at,
+        Query.updated_at,
+        # Compute age_days in SQL: EXTRACT(DAY FROM NOW() - inserted_at)::int
+        func.extract("day", func.now() - Query.inserted_at).cast(Integer).label("age_days"),
+    )
+    .where(Query.query_tsvector.op("@@")(_search_tsquery))
+    .order_by(func.ts_rank(Query.query_tsvector, _search_tsquery).desc())
+    .limit(bindparam("limit", type_=Integer))
+)
+
+# URLs are unique per generation, so any-generation lookups prefer the active
+# row, then the newest; the active-only lookup matches at most one row
+_DOCUMENT_BY_URL_STMT = (
+    select(Document)
+    .where(Document.url == bindparam("url", type_=String))
+    .order_by(Document.generation_active.desc(), Document.inserted_at.desc())
+    .limit(1)
+)
+_ACTIVE_DOCUMENT_BY_URL_STMT = select(Document).where(
+    Document.url == bindparam("url", type_=String),
+    Document.generation_active == True,  # noqa: E712 - SQLAlchemy comparison
+)
+
+# Atomic swap: active = (generation_id == new_gen_id), only touching rows
+# whose flag actually flips so already-hidden generations aren't rewritten
+_ACTIVATE_GENERATION_SQL = text("""
+	UPDATE documents
+	SET generation_active = (generation_id = :gen_id)
+	WHERE domain = :domain
+	  AND generation_active IS DISTINCT FROM (generation_id = :gen_id)
+	RETURNING generation_active
+""")
+
+
+# Session shared by storage calls made inside a transaction() block
+_current_session: ContextVar[AsyncSession | None] = ContextVar("sensei_session", default=None)
+
 
 def AsyncSessionLocal():
     """Get a session from the configured factory."""
     return get_session_factory()()
 
 
-def _to_cache_hit(q: Query, age_days: int) -> CacheHit:
-    """Convert SQLAlchemy Query + computed age_days to CacheHit."""
-    data = {k: getattr(q, k) for k in CacheHit.model_fields if k != "age_days"}
-    data["age_days"] = age_days
-    return CacheHit(**data)
+@asynccontextmanager
+async def transaction() -> AsyncIterator[AsyncSession]:
+    """Group several storage calls into one transaction.
+
+    Storage functions called inside the block reuse its session instead of
+    opening their own, and everything commits once on exit (or rolls back
+    if the block raises). A nested block runs in a SAVEPOINT on the outer
+    session: if it raises, only its own writes roll back, and the outer
+    block can catch the error and still commit.
+
+    The session is not safe for concurrent use, so don't gather() storage
+    calls inside the block.
+
+    Example:
+        async with storage.transaction():
+            doc_id = await storage.insert_document(...)
+            await storage.insert_sections(sections)
+    """
+    if (session := _current_session.get()) is not None:
+        async with session.begin_nested():
+            yield session
+        return
+
+    async with AsyncSessionLocal() as session:
+        token = _current_session.set(session)
+        try:
+            yield session
+            await session.commit()
+        finally:
+            _current_session.reset(token)
+
+
+@asynccontextmanager
+async def _session() -> AsyncIterator[AsyncSession]:
+    """Yield the enclosing transaction's session, or a new one committed on exit."""
+    if (session := _current_session.get()) is not None:
+        yield session
+        # Flush so later statements in the transaction see these writes
+        await session.flush()
+        return
+
+    async with AsyncSessionLocal() as session:
+        yield session
+        await session.commit()
 
 
 async def save_query(
@@ -48,26 +150,55 @@ async def save_query(
         The generated UUID for the saved query
     """
     logger.info("Saving query to database")
-    async with AsyncSessionLocal() as session:
-        query_record = Query(
-            query=query,
-            language=language,
-            library=library,
-            version=version,
-            output=output,
-            messages=messages,
+    async with _session() as session:
+        # RETURNING fetches the server-generated id in the INSERT round-trip
+        result = await session.execute(
+            insert(Query)
+            .values(
+                query=query,
+                language=language,
+                library=library,
+                version=version,
+                output=output,
+                messages=messages,
+            )
+            .returning(Query.id)
         )
-        session.add(query_record)
-        await session.commit()
-        await session.refresh(query_record)
-        logger.debug(f"Query saved: id={query_record.id}")
-        return query_record.id
+        query_id = result.scalar_one()
+    logger.debug(f"Query saved: id={query_id}")
+    return query_id
+
+
+async def save_queries(queries: list[QueryContent]) -> list[UUID]:
+    """Save several queries and their responses in one round-trip.
+
+    Rows go out as a multi-row INSERT ... RETURNING (SQLAlchemy's
+    insertmanyvalues), in a single transaction.
+
+    Args:
+        queries: The queries to save
+
+    Returns:
+        The generated UUIDs, in the same order as queries
+    """
+    if not queries:
+        return []
+
+    logger.info(f"Saving {len(queries)} queries to database")
+    async with _session() as session:
+        result = await session.execute(
+            insert(Query).returning(Query.id, sort_by_parameter_order=True),
+            [q.model_dump() for q in queries],
+        )
+        query_ids = list(result.scalars().all())
+    logger.debug(f"Queries saved: {len(query_ids)}")
+    return query_ids
 
 
 async def save_rating(rating: Rating) -> None:
     """Save a rating for a query response."""
     logger.info(f"Saving rating to database: query_id={rating.query_id}")
-    async with AsyncSessionLocal() as session:
+    async with _session() as session:
         rating_record = RatingModel(
             query_id=rating.query_id,
             correctness=rating.correctness,
@@ -79,7 +210,6 @@ async def save_rating(rating: Rating) -> None:
             agent_version=rating.agent_version,
         )
         session.add(rating_record)
-        await session.commit()
     logger.debug(
         f"Rating saved: query_id={rating.query_id}, scores=({rating.correctness}, {rating.relevance}, {rating.usefulness})"
     )
@@ -94,7 +224,7 @@ async def get_query(id: UUID) -> Optional[Query]:
     Returns:
         Query object if found, None otherwise
     """
-    async with AsyncSessionLocal() as session:
+    async with _session() as session:
         result = await session.execute(select(Query).where(Query.id == id))
         return result.scalar_one_or_none()
 
@@ -106,7 +236,8 @@ async def search_queries(
     """Search cached queries using PostgreSQL full-text search.
 
     Uses websearch_to_tsquery for natural language query parsing
-    and ts_rank for relevance ordering.
+    and ts_rank for relevance ordering. The @@ match is served by the
+    ix_queries_query_tsvector GIN index, so lookups don't scan the table.
 
     Args:
         query: Natural language search query
@@ -120,36 +251,30 @@ async def search_queries(
     if not query.strip():
         return []
 
-    async with AsyncSessionLocal() as session:
-        # Compute age_days in SQL: EXTRACT(DAY FROM NOW() - inserted_at)::int
-        age_days_expr = func.extract("day", func.now() - Query.inserted_at).cast(Integer).label("age_days")
-        tsquery = func.websearch_to_tsquery("english", query)
-
-        stmt = (
-            select(Query, age_days_expr)
-            .where(Query.query_tsvector.op("@@")(tsquery))
-            .order_by(func.ts_rank(Query.query_tsvector, tsquery).desc())
-            .limit(limit)
-        )
-
-        result = await session.execute(stmt)
-        rows = result.all()
+    async with _session() as session:
+        result = await session.execute(_SEARCH_QUERIES_STMT, {"query": query, "limit": limit})
+        rows = result.mappings().all()
 
-    return [_to_cache_hit(q, age) for q, age in rows]
+    # Rows come straight from typed Query columns, so skip pydantic validation
+    return [CacheHit.model_construct(**row) for row in rows]
 
 
 async def insert_document(
     domain: str,
     url: str,
     path: str,
-    content_hash: str,
+    content_hash: bytes,
     generation_id: UUID,
-) -> UUID:
+) -> Optional[UUID]:
     """Insert a new document for a generation (no upsert logic).
 
     With generation-based crawls, we always insert new documents for each crawl.
     Old documents are cleaned up after the generation swap.
 
+    A URL is stored once per generation. Different requests can resolve to the
+    same URL (e.g. redirects), so a second insert is skipped via
+    ON CONFLICT DO NOTHING instead of failing on the unique constraint.
+
     Note: Content is stored in sections, not documents.
     Call insert_sections() after this to save the content.
 
@@ -157,26 +282,89 @@ async def insert_document(
         domain: Source domain (e.g., 'llmstext.org')
         url: Full URL of the document
         path: Path portion of the URL
-        content_hash: Hash for change detection (future optimization)
+        content_hash: Digest bytes for change detection (future optimization)
         generation_id: The generation this document belongs to
 
     Returns:
-        The generated document ID
+        The generated document ID, or None if the URL already exists in this generation
     """
-    async with AsyncSessionLocal() as session:
-        db_doc = Document(
-            domain=domain,
-            url=url,
-            path=path,
-            content_hash=content_hash,
-            generation_id=generation_id,
-            generation_active=False,  # Not visible until generation swap
+    async with _session() as session:
+        result = await session.execute(
+            pg_insert(Document)
+            .values(
+                domain=domain,
+                url=url,
+                path=path,
+                content_hash=content_hash,
+                generation_id=generation_id,
+                generation_active=False,  # Not visible until generation swap
+            )
+            .on_conflict_do_nothing(constraint="documents_url_generation_key")
+            .returning(Document.id)
         )
-        session.add(db_doc)
-        await session.commit()
-        await session.refresh(db_doc)
+        doc_id = result.scalar_one_or_none()
+
+    if doc_id is None:
+        logger.info(f"Document already in generation, skipped: {url} (generation={generation_id})")
+    else:
         logger.info(f"Document inserted: {url} (generation={generation_id})")
-        return db_doc.id
+    return doc_id
+
+
+async def insert_documents(documents: list[DocumentRecord], generation_id: UUID) -> list[UUID | None]:
+    """Bulk insert documents for a generation.
+
+    Sends one multi-row INSERT ... RETURNING per batch of DOCUMENT_BATCH_SIZE
+    documents instead of a round-trip per document. Each batch commits on its
+    own, unless called inside transaction(), where batches only flush and
+    commit with the enclosing block.
+
+    Like insert_document(), documents are inserted inactive, content is
+    stored separately via insert_sections(), and a URL already stored for the
+    generation is skipped (ON CONFLICT DO NOTHING). When the input repeats a
+    URL, only its first occurrence is inserted.
+
+    For loading documents that are already in hand. The crawler can't use
+    this: its handler sees one page at a time, and each page's sections need
+    the document ID within the same per-page transaction, so it calls
+    insert_document().
+
+    Args:
+        documents: Documents to insert
+        generation_id: The generation these documents belong to
+
+    Returns:
+        One entry per document, in input order: the generated ID, or None if
+        the document was skipped as a duplicate
+    """
+    doc_ids: list[UUID | None] = []
+    for start in range(0, len(documents), DOCUMENT_BATCH_SIZE):
+        batch = documents[start : start + DOCUMENT_BATCH_SIZE]
+        async with _session() as session:
+            result = await session.execute(
+                pg_insert(Document)
+                .on_conflict_do_nothing(constraint="documents_url_generation_key")
+                .returning(Document.url, Document.id),
+                [
+                    {
+                        "domain": doc.domain,
+                        "url": doc.url,
+                        "path": doc.path,
+                        "content_hash": doc.content_hash,
+                        "generation_id": generation_id,
+                        "generation_active": False,  # Not visible until generation swap
+                    }
+                    for doc in batch
+                ],
+            )
+            # Skipped rows return nothing, so match inserted rows back by URL
+            # (unique within the generation); pop so repeats map to None
+            ids_by_url = dict(result.tuples().all())
+        doc_ids.extend(ids_by_url.pop(doc.url, None) for doc in batch)
+
+    inserted = sum(doc_id is not None for doc_id in doc_ids)
+    logger.info(f"Documents inserted: {inserted}/{len(doc_ids)} (generation={generation_id})")
+    return doc_ids
 
 
 async def activate_generation(domain: str, generation_id: UUID) -> int:
@@ -191,23 +379,40 @@ async def activate_generation(domain: str, generation_id: UUID) -> int:
         generation_id: The new generation to activate
 
     Returns:
-        Number of documents activated
+        Number of documents newly activated
     """
-    async with AsyncSessionLocal() as session:
-        # Atomic swap: active = (generation_id == new_gen_id)
+    async with _session() as session:
         result = await session.execute(
-            text("""
-				UPDATE documents
-				SET generation_active = (generation_id = :gen_id)
-				WHERE domain = :domain
-				RETURNING id
-			"""),
+            _ACTIVATE_GENERATION_SQL,
             {"domain": domain, "gen_id": str(generation_id)},
         )
-        count = len(result.fetchall())
-        await session.commit()
-        logger.info(f"Activated generation {generation_id} for {domain}: {count} documents")
-        return count
+        # Changed rows are either newly shown (true) or newly hidden (false)
+        count = sum(result.scalars().all())
+    logger.info(f"Activated generation {generation_id} for {domain}: {count} documents")
+    return count
+
+
+async def _delete_documents_in_batches(*criteria) -> int:
+    """Delete documents matching criteria, CLEANUP_BATCH_SIZE rows per transaction.
+
+    Sections are deleted via CASCADE. Bounded batches mean purging a large
+    domain never holds one long transaction.
+
+    Returns:
+        Number of documents deleted
+    """
+    batch_ids = select(Document.id).where(*criteria).limit(CLEANUP_BATCH_SIZE).scalar_subquery()
+    # The IN (subquery) predicate can't be evaluated in Python, so skip
+    # session synchronization rather than fetching back every deleted ID
+    stmt = delete(Document).where(Document.id.in_(batch_ids)).execution_options(synchronize_session=False)
+
+    count = 0
+    while True:
+        async with _session() as session:
+            result = await session.execute(stmt)
+        count += result.rowcount
+        if result.rowcount < CLEANUP_BATCH_SIZE:
+            return count
 
 
 async def cleanup_old_generations(domain: str) -> int:
@@ -216,23 +421,21 @@ async def cleanup_old_generations(domain: str) -> int:
     Should be called after activate_generation to clean up old generations.
     Sections are deleted via CASCADE.
 
+    Deletes in batches of CLEANUP_BATCH_SIZE documents, one transaction per
+    batch.
+
     Args:
         domain: The domain to clean up
 
     Returns:
         Number of documents deleted
     """
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(
-            delete(Document).where(
-                Document.domain == domain,
-                Document.generation_active == False,  # noqa: E712 - SQLAlchemy comparison
-            )
-        )
-        await session.commit()
-        count = result.rowcount
-        logger.info(f"Cleaned up {count} old documents for {domain}")
-        return count
+    count = await _delete_documents_in_batches(
+        Document.domain == domain,
+        Document.generation_active == False,  # noqa: E712 - SQLAlchemy comparison
+    )
+    logger.info(f"Cleaned up {count} old documents for {domain}")
+    return count
 
 
 async def insert_sections(sections: list[Section]) -> int:
@@ -250,13 +453,12 @@ async def insert_sections(sections: list[Section]) -> int:
     if not sections:
         return 0
 
-    async with AsyncSessionLocal() as session:
+    async with _session() as session:
         session.add_all(sections)
-        await session.commit()
 
-        doc_id = sections[0].document_id if sections else None
-        logger.info(f"Inserted {len(sections)} sections for document {doc_id}")
-        return len(sections)
+    doc_id = sections[0].document_id if sections else None
+    logger.info(f"Inserted {len(sections)} sections for document {doc_id}")
+    return len(sections)
 
 
 async def delete_sections_by_document(document_id: UUID) -> int:
@@ -268,15 +470,15 @@ async def delete_sections_by_document(document_id: UUID) -> int:
     Returns:
         Number of sections deleted
     """
-    async with AsyncSessionLocal() as session:
+    async with _session() as session:
         result = await session.execute(delete(Section).where(Section.document_id == document_id))
-        await session.commit()
         return result.rowcount
 
 
 async def get_sections_by_document(
     domain: str,
     path: str,
+    with_content: bool = True,
 ) -> list[Section]:
     """Get all sections for an active document, ordered by position.
 
@@ -286,13 +488,16 @@ async def get_sections_by_document(
     Args:
         domain: Document domain
         path: Document path
+        with_content: If False, skip loading section content (the bulk of
+                      the bytes) for callers that only need the outline;
+                      accessing .content on the results then raises
 
     Returns:
         List of Section objects ordered by position
     """
-    async with AsyncSessionLocal() as session:
+    async with _session() as session:
         # Single query with JOIN instead of two separate queries
-        result = await session.execute(
+        stmt = (
             select(Section)
             .join(Document, Document.id == Section.document_id)
             .where(
@@ -302,6 +507,9 @@ async def get_sections_by_document(
             )
             .order_by(Section.position)
         )
+        if not with_content:
+            stmt = stmt.options(defer(Section.content, raiseload=True))
+        result = await session.execute(stmt)
         return list(result.scalars().all())
 
 
@@ -310,16 +518,16 @@ async def get_document_by_url(url: str, active_only: bool = True) -> Optional[Do
 
     Args:
         url: The full URL of the document
-        active_only: If True (default), only return active documents
+        active_only: If True (default), only return active documents.
+                     If False and the URL exists in several generations,
+                     the active one wins, then the most recently inserted.
 
     Returns:
         Document if found, None otherwise
     """
-    async with AsyncSessionLocal() as session:
-        query = select(Document).where(Document.url == url)
-        if active_only:
-            query = query.where(Document.generation_active == True)  # noqa: E712
-        result = await session.execute(query)
+    stmt = _ACTIVE_DOCUMENT_BY_URL_STMT if active_only else _DOCUMENT_BY_URL_STMT
+    async with _session() as session:
+        result = await session.execute(stmt, {"url": url})
         return result.scalar_one_or_none()
 
 
@@ -334,7 +542,7 @@ async def has_active_documents(domain: str) -> bool:
     Returns:
         True if domain has at least one active document, False otherwise
     """
-    async with AsyncSessionLocal() as session:
+    async with _session() as session:
         result = await session.execute(
             select(Document.id)
             .where(
@@ -351,18 +559,19 @@ async def delete_documents_by_domain(domain: str) -> int:
 
     Useful for re-crawling a domain from scratch.
 
+    Deletes in batches of CLEANUP_BATCH_SIZE documents, one transaction per
+    batch, so a large domain never holds one long transaction. Sections are
+    deleted via CASCADE.
+
     Args:
         domain: The domain to delete documents for
 
     Returns:
-        Number of documents deleted
+        Number of documents deleted, whether active or not
     """
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(delete(Document).where(Document.domain == domain))
-        await session.commit()
-        count = result.rowcount
-        logger.info(f"Deleted {count} documents for domain: {domain}")
-        return count
+    count = await _delete_documents_in_batches(Document.domain == domain)
+    logger.info(f"Deleted {count} documents for domain: {domain}")
+    return count
 
 
 async def search_sections_fts(
@@ -391,7 +600,7 @@ async def search_sections_fts(
     if not query.strip():
         return []
 
-    async with AsyncSessionLocal() as session:
+    async with _session() as session:
         # Simple query using precomputed heading_path column
         # Only search active documents (generation_active = true)
         sql = """
@@ -0,0 +1,39 @@
+"""add_documents_domain_path_active_index
+
+Revision ID: 87105aa6ecc0
+Revises: r4uuek58xch9
+Create Date: 2026-10-15
+
+Adds a partial index over active documents keyed by (domain, path).
+Document reads (get_sections_by_document, search_sections_fts,
+has_active_documents) always filter on generation_active = true, so the
+index only holds the visible generation and stays compact no matter how
+many old generations are waiting for cleanup. INCLUDE (id, url) covers
+every documents column those reads use, so they can be index-only scans.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "87105aa6ecc0"
+down_revision: Union[str, None] = "r4uuek58xch9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_documents_domain_path_active",
+        "documents",
+        ["domain", "path"],
+        unique=False,
+        postgresql_include=["id", "url"],
+        postgresql_where=sa.text("generation_active = true"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_documents_domain_path_active", table_name="documents")
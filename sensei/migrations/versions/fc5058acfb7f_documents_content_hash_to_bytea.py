@@ -0,0 +1,36 @@
+"""documents_content_hash_to_bytea
+
+Revision ID: fc5058acfb7f
+Revises: 87105aa6ecc0
+Create Date: 2026-10-15
+
+Stores documents.content_hash as raw digest bytes instead of hex text.
+Existing values are hex-encoded SHA-256 prefixes, so decode() yields
+exactly the bytes the crawler now writes for the same content.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "fc5058acfb7f"
+down_revision: Union[str, None] = "87105aa6ecc0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        ALTER TABLE documents
+        ALTER COLUMN content_hash TYPE BYTEA
+        USING decode(content_hash, 'hex')
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        ALTER TABLE documents
+        ALTER COLUMN content_hash TYPE VARCHAR
+        USING encode(content_hash, 'hex')
+    """)
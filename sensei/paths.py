@@ -2,12 +2,17 @@
 
 This module handles all path detection and management. Uses SENSEI_HOME
 environment variable with ~/.sensei default.
+
+Paths are resolved once per process and cached; call cache_clear() on a
+getter after changing its environment variables (tests do this).
 """
 
 import os
+from functools import cache
 from pathlib import Path
 
 
+@cache
 def get_sensei_home() -> Path:
     """Get the sensei home directory.
 
@@ -21,6 +26,7 @@ def get_sensei_home() -> Path:
     return Path.home() / ".sensei"
 
 
+@cache
 def get_scout_repos() -> Path:
     """Get scout repository cache directory.
 
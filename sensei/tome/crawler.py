@@ -28,6 +28,7 @@ from sensei.database.storage import (
     cleanup_old_generations,
     insert_document,
     insert_sections,
+    transaction,
 )
 from sensei.tome.chunker import SectionData, chunk_markdown
 from sensei.tome.parser import extract_path, is_same_site, parse_llms_txt_links
@@ -53,9 +54,13 @@ CONCURRENCY = ConcurrencySettings(min_concurrency=1, max_concurrency=10)
 ALLOWED_CONTENT_TYPES = frozenset({"text/markdown", "text/plain", "text/x-markdown"})
 
 
-def content_hash(content: str) -> str:
-    """Generate a hash for content change detection."""
-    return hashlib.sha256(content.encode()).hexdigest()[:16]
+def content_hash(content: bytes) -> bytes:
+    """Generate a hash for content change detection (8 raw digest bytes).
+
+    Takes the raw UTF-8 body so callers hash what they downloaded instead of
+    re-encoding the decoded string.
+    """
+    return hashlib.sha256(content).digest()[:8]
 
 
 def is_markdown_content(content_type: str | None) -> bool:
@@ -188,8 +193,9 @@ async def ingest_domain(domain: str, max_depth: int = 10) -> Success[IngestResul
             result.warnings.append(ContentTypeWarning(url, content_type))
             return
 
+        body = await context.http_response.read()
         try:
-            content = (await context.http_response.read()).decode("utf-8")
+            content = body.decode("utf-8")
         except UnicodeDecodeError as e:
             sentry_sdk.capture_exception(e)
             logger.error(f"Failed to decode content: {url}")
@@ -197,20 +203,26 @@ async def ingest_domain(domain: str, max_depth: int = 10) -> Success[IngestResul
             return
 
         # Insert document for this generation (not yet visible to queries)
-        hash_value = content_hash(content)
-        doc_id = await insert_document(
-            domain=normalized_domain,
-            url=url,
-            path=extract_path(url),
-            content_hash=hash_value,
-            generation_id=generation_id,
-        )
-        result.documents_added += 1
-
-        # Chunk markdown, flatten tree, and insert sections
+        # together with its sections, in a single transaction
+        hash_value = content_hash(body)
         section_tree = chunk_markdown(content)
-        sections = flatten_section_tree(section_tree, doc_id)
-        await insert_sections(sections)
+        async with transaction():
+            doc_id = await insert_document(
+                domain=normalized_domain,
+                url=url,
+                path=extract_path(url),
+                content_hash=hash_value,
+                generation_id=generation_id,
+            )
+            if doc_id is not None:
+                sections = flatten_section_tree(section_tree, doc_id)
+                await insert_sections(sections)
+
+        # Another request already resolved to this URL and handled it
+        if doc_id is None:
+            return
+
+        result.documents_added += 1
         logger.debug(f"Inserted {len(sections)} sections for {url}")
 
         # Parse links and enqueue same-domain ones if within depth limit
@@ -179,8 +179,8 @@ async def tome_toc(
 
     logger.debug(f"tome_toc: domain={domain}, path={actual_path}")
 
-    # Get section hierarchy data
-    sections = await storage.get_sections_by_document(domain, actual_path)
+    # Get section hierarchy data (headings only, content not needed)
+    sections = await storage.get_sections_by_document(domain, actual_path, with_content=False)
     if not sections:
         return NoResults()
 
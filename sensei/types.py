@@ -213,7 +213,7 @@ class CacheHit(BaseModel):
     library: str | None = None
     version: str | None = None
     output: str
-    messages: str | None = None
+    messages: list[dict] | None = None
     inserted_at: datetime
     updated_at: datetime
 
@@ -230,6 +230,20 @@ class SubSenseiResult(BaseModel):
     age_days: int | None = None
 
 
+class QueryContent(BaseModel):
+    """A query and its response to save.
+
+    Used by save_queries() to pass query data to the storage layer in bulk.
+    """
+
+    query: str = Field(..., description="The user's query string")
+    output: str = Field(..., description="Final text output from the agent")
+    messages: list[dict] | None = Field(None, description="All intermediate messages (tool calls, results)")
+    language: str | None = Field(None, description="Programming language filter")
+    library: str | None = Field(None, description="Library/framework name")
+    version: str | None = Field(None, description="Version specification")
+
+
 class DocumentContent(BaseModel):
     """Content to save for a crawled document.
 
@@ -241,10 +255,23 @@ class DocumentContent(BaseModel):
     url: str = Field(..., description="Full URL of the document")
     path: str = Field(..., description="Path portion of the URL")
     content: str = Field(..., description="Markdown content")
-    content_hash: str = Field(..., description="Hash for change detection")
+    content_hash: bytes = Field(..., description="Hash digest for change detection")
     depth: int = Field(..., ge=0, description="Crawl depth (0 = llms.txt, 1+ = linked)")
 
 
+class DocumentRecord(BaseModel):
+    """A document row to insert for a generation.
+
+    Used by insert_documents() for bulk inserts. Carries only the stored
+    columns: content lives in sections, inserted separately.
+    """
+
+    domain: str = Field(..., description="Source domain (e.g., 'llmstext.org')")
+    url: str = Field(..., description="Full URL of the document")
+    path: str = Field(..., description="Path portion of the URL")
+    content_hash: bytes = Field(..., description="Hash digest for change detection")
+
+
 class IngestResult(BaseModel):
     """Result of ingesting a domain's llms.txt documentation.
 
@@ -13,8 +13,8 @@ from concurrent.futures import ThreadPoolExecutor
 import pytest_asyncio
 from alembic import command
 from alembic.config import Config
-from sqlalchemy import event
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
 # Test database URL - uses a separate test database
 # Default assumes docker-compose postgres with sensei_test database
@@ -38,23 +38,43 @@ async def run_migrations(database_url: str) -> None:
         await loop.run_in_executor(pool, _run_migrations_sync, database_url)
 
 
-class TestAsyncSession(AsyncSession):
-    async def __aenter__(self) -> "TestAsyncSession":
-        await super().__aenter__()
-        await self.begin_nested()
+@pytest_asyncio.fixture(scope="session")
+async def _run_migrations():
+    """Apply all migrations once per test session."""
+    await run_migrations(TEST_DATABASE_URL)
 
-        @event.listens_for(self.sync_session, "after_transaction_end")
-        def _restart_savepoint(session, transaction):
-            if transaction.nested and not transaction._parent.nested:
-                session.begin_nested()
 
-        return self
+@pytest_asyncio.fixture(scope="session")
+async def migrated_db(_run_migrations):
+    """Provide the migrated engine for read-only schema inspection.
+
+    Schema tests only read catalog metadata, so they share one migrated
+    database for the whole session instead of a per-test rollback transaction.
+    """
+    return engine
 
 
 @pytest_asyncio.fixture(scope="session")
-async def _run_migrations():
-    """Apply all migrations once per test session."""
-    await run_migrations(TEST_DATABASE_URL)
+async def schema_snapshot(migrated_db):
+    """Reflect the migrated schema once per session.
+
+    Returns {"tables": set, "columns": {table: set}, "indexes": {table: set}}
+    of names, collected in a single inspector pass. The get_multi_* calls
+    reflect every table in one catalog query each, not one per table.
+    """
+
+    def reflect(connection):
+        inspector = inspect(connection)
+        columns = inspector.get_multi_columns()
+        indexes = inspector.get_multi_indexes()
+        return {
+            "tables": set(inspector.get_table_names()),
+            "columns": {table: {col["name"] for col in cols} for (_, table), cols in columns.items()},
+            "indexes": {table: {idx["name"] for idx in idxs} for (_, table), idxs in indexes.items()},
+        }
+
+    async with migrated_db.connect() as conn:
+        return await conn.run_sync(reflect)
 
 
 @pytest_asyncio.fixture
@@ -63,7 +83,8 @@ async def test_db(_run_migrations):
 
     This fixture:
     1. Ensures all Alembic migrations are applied (session-scoped)
-    2. Binds sessions to a connection with an outer transaction
+    2. Binds sessions to a connection with an outer transaction; each session
+       works in a SAVEPOINT, so its commit/rollback never ends the outer one
     3. Rolls back the outer transaction after each test
 
     Prerequisites:
@@ -75,8 +96,8 @@ async def test_db(_run_migrations):
         trans = await conn.begin()
         test_session_factory = async_sessionmaker(
             bind=conn,
-            class_=TestAsyncSession,
             expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
         )
         set_test_session_factory(test_session_factory)
 
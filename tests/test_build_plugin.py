@@ -0,0 +1,65 @@
+"""Tests for the plugin build script's hand-written YAML frontmatter."""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+import yaml
+
+_SCRIPT = Path(__file__).parent.parent / "scripts" / "build_plugin.py"
+_spec = importlib.util.spec_from_file_location("build_plugin", _SCRIPT)
+build_plugin = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(build_plugin)
+
+
+def _load_frontmatter(frontmatter: str) -> dict:
+    """Parse frontmatter emitted by build_frontmatter back into a dict."""
+    assert frontmatter.startswith("---\n") and frontmatter.endswith("---\n\n")
+    return yaml.safe_load(frontmatter.removeprefix("---\n").removesuffix("---\n\n"))
+
+
+@pytest.mark.parametrize("output", build_plugin.OUTPUTS, ids=lambda output: output["path"])
+def test_frontmatter_matches_yaml_dump(output):
+    """Generated plugin frontmatter is byte-identical to yaml.dump's."""
+    expected = yaml.dump(output["frontmatter"], default_flow_style=False, allow_unicode=True, width=80)
+    assert build_plugin.build_frontmatter(output["frontmatter"]) == f"---\n{expected}---\n\n"
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        # YAML 1.1 implicit bool, null, int, float and timestamp scalars
+        "yes",
+        "no",
+        "on",
+        "Off",
+        "true",
+        "null",
+        "~",
+        "123",
+        "1.5",
+        "0x1F",
+        ".inf",
+        "2024-01-01",
+        "2024-01-01 10:00:00",
+        "<<",
+        "",
+        # Indicators and characters plain or single-quoted scalars can't hold
+        "ends:",
+        "key: value",
+        "text #comment",
+        "- item",
+        "tab\tinside",
+        "\tleading tab",
+        "trailing space \nnext line",
+        "line\n  indented",
+        'quote\'s and "double" \\ backslash',
+        "next\x85line and separator",
+        "é 汉字 🚀 <query>",
+        ("long prose " * 20).strip(),
+    ],
+)
+def test_frontmatter_round_trips_through_safe_load(value):
+    """Every string value loads back as the same string."""
+    data = {"description": value, "name": "x"}
+    assert _load_frontmatter(build_plugin.build_frontmatter(data)) == data
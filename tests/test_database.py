@@ -1,45 +1,88 @@
 """Tests for database operations."""
 
-import hashlib
+from functools import cache
 from uuid import UUID, uuid4
 
 import pytest
 
 from sensei.database import storage
-from sensei.tome.crawler import flatten_section_tree
-from sensei.types import Rating, SectionData
-
-
+from sensei.tome.crawler import content_hash, flatten_section_tree
+from sensei.types import DocumentRecord, QueryContent, Rating, SectionData
+
+# Query ID that never exists, for foreign key violations
+_FAKE_QUERY_ID = UUID(int=0x11111111_1111_1111_1111_111111111111)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        pytest.param(
+            QueryContent(query="How do I use FastAPI?", output="# FastAPI Usage\n\nHere's how..."),
+            id="minimal",
+        ),
+        pytest.param(
+            QueryContent(
+                query="What is Python?",
+                output="# Python\n\nPython is...",
+                messages=[{"role": "user", "content": "test"}],
+            ),
+            id="messages",
+        ),
+        pytest.param(
+            QueryContent(
+                query="How to use TypeScript generics?",
+                output="# Generics\n\nGeneric types allow...",
+                messages=[{"role": "assistant", "content": "Let me explain..."}],
+                language="typescript",
+                library="typescript",
+                version="5.0",
+            ),
+            id="all_optional_fields",
+        ),
+        pytest.param(
+            QueryContent(
+                query="Comment utiliser les hooks React? 你好 🚀",
+                output="# React Hooks\n\nLes hooks permettent... émojis: 🎉 汉字",
+            ),
+            id="unicode",
+        ),
+    ],
+)
 @pytest.mark.usefixtures("test_db")
 @pytest.mark.asyncio
-async def test_save_query():
-    """Test saving a query."""
-    query = "How do I use FastAPI?"
-    markdown = "# FastAPI Usage\n\nHere's how..."
-
-    query_id = await storage.save_query(query=query, output=markdown)
+async def test_save_query(content):
+    """Test saving a query and reading every field back."""
+    query_id = await storage.save_query(**content.model_dump())
 
     # Retrieve and verify
     retrieved = await storage.get_query(query_id)
     assert retrieved is not None
     assert retrieved.id == query_id
-    assert retrieved.query == query
-    assert retrieved.output == markdown
+    assert {field: getattr(retrieved, field) for field in QueryContent.model_fields} == content.model_dump()
 
 
 @pytest.mark.usefixtures("test_db")
 @pytest.mark.asyncio
-async def test_save_query_with_messages():
-    """Test saving a query with messages."""
-    query = "What is Python?"
-    markdown = "# Python\n\nPython is..."
-    messages = [{"role": "user", "content": "test"}]
+async def test_save_queries():
+    """Test bulk saving queries returns IDs in input order."""
+    queries = [
+        QueryContent(query="How do React hooks work?", output="Answer 1", library="react"),
+        QueryContent(query="What is Python?", output="Answer 2", messages=[{"role": "user", "content": "test"}]),
+    ]
 
-    query_id = await storage.save_query(query=query, output=markdown, messages=messages)
+    query_ids = await storage.save_queries(queries)
+    assert len(query_ids) == 2
 
-    retrieved = await storage.get_query(query_id)
-    assert retrieved is not None
-    assert retrieved.messages == [{"role": "user", "content": "test"}]
+    for query_id, query in zip(query_ids, queries):
+        retrieved = await storage.get_query(query_id)
+        assert retrieved is not None
+        assert retrieved.query == query.query
+        assert retrieved.output == query.output
+        assert retrieved.messages == query.messages
+        assert retrieved.library == query.library
+
+    # Empty input is a no-op
+    assert await storage.save_queries([]) == []
 
 
 @pytest.mark.usefixtures("test_db")
@@ -86,9 +129,13 @@ async def test_get_query_not_found():
 async def test_search_queries():
     """Test search queries using FTS."""
     # Insert test data
-    await storage.save_query(query="How do React hooks work?", output="Answer 1", library="react", version="18")
-    await storage.save_query(query="React component lifecycle", output="Answer 2", library="react")
-    await storage.save_query(query="Python async await", output="Answer 3", library="python")
+    await storage.save_queries(
+        [
+            QueryContent(query="How do React hooks work?", output="Answer 1", library="react", version="18"),
+            QueryContent(query="React component lifecycle", output="Answer 2", library="react"),
+            QueryContent(query="Python async await", output="Answer 3", library="python"),
+        ]
+    )
 
     # Search for "React"
     results = await storage.search_queries("React", limit=10)
@@ -99,14 +146,43 @@ async def test_search_queries():
     assert len(results) == 0
 
 
+@pytest.mark.usefixtures("test_db")
+@pytest.mark.asyncio
+async def test_search_queries_with_messages():
+    """Test search results carry the stored JSONB messages."""
+    messages = [{"role": "user", "content": "test"}]
+    query_id = await storage.save_query(query="React suspense boundaries", output="Answer", messages=messages)
+
+    results = await storage.search_queries("suspense")
+    assert len(results) == 1
+    assert results[0].id == query_id
+    assert results[0].messages == messages
+    assert results[0].age_days == 0
+
+
 # =============================================================================
 # Document and Section Storage Tests
 # =============================================================================
 
 
-def _hash(content: str) -> str:
-    """Helper to compute content hash."""
-    return hashlib.sha256(content.encode()).hexdigest()
+@cache
+def _hash(content: str | bytes) -> bytes:
+    """Helper to compute content hash the way the crawler does.
+
+    Accepts the raw body bytes directly, like the crawler, to skip an encode.
+    """
+    if isinstance(content, str):
+        content = content.encode()
+    return content_hash(content)
+
+
+# Hashes of bodies shared across tests, computed once at import
+_CONTENT_HASH = _hash("content")
+_DOC_HASH = _hash("doc")
+_HOOKS_HASH = _hash("hooks")
+_V1_HASH = _hash("v1")
+_V2_HASH = _hash("v2")
+_VERSION_1_HASH = _hash("Version 1")
 
 
 @pytest.mark.usefixtures("test_db")
@@ -118,7 +194,7 @@ async def test_insert_document():
         domain="llmstext.org",
         url="https://llmstext.org/docs/hooks/useState",
         path="/docs/hooks/useState",
-        content_hash=_hash("content"),
+        content_hash=_CONTENT_HASH,
         generation_id=generation_id,
     )
 
@@ -133,10 +209,112 @@ async def test_insert_document():
     assert doc is not None
     assert doc.domain == "llmstext.org"
     assert doc.path == "/docs/hooks/useState"
+    assert doc.content_hash == _CONTENT_HASH
     assert doc.generation_id == generation_id
     assert doc.generation_active is False
 
 
+@pytest.mark.usefixtures("test_db")
+@pytest.mark.asyncio
+async def test_insert_documents():
+    """Test bulk inserting documents returns IDs in input order, skipping duplicates."""
+    generation_id = uuid4()
+    documents = [
+        DocumentRecord(
+            domain="llmstext.org",
+            url=f"https://llmstext.org/docs/page{i}",
+            path=f"/docs/page{i}",
+            content_hash=_hash(f"Page {i}"),
+        )
+        for i in range(3)
+    ]
+
+    doc_ids = await storage.insert_documents(documents, generation_id)
+    assert len(doc_ids) == 3
+
+    for doc_id, document in zip(doc_ids, documents):
+        doc = await storage.get_document_by_url(document.url, active_only=False)
+        assert doc is not None
+        assert doc.id == doc_id
+        assert doc.generation_id == generation_id
+        assert doc.generation_active is False
+
+    # URLs already in the generation, or repeated in the input, are skipped
+    new_page = documents[0].model_copy(update={"url": "https://llmstext.org/docs/new", "path": "/docs/new"})
+    retry_ids = await storage.insert_documents([documents[1], new_page, new_page], generation_id)
+
+    new_doc = await storage.get_document_by_url(new_page.url, active_only=False)
+    assert retry_ids == [None, new_doc.id, None]
+    existing = await storage.get_document_by_url(documents[1].url, active_only=False)
+    assert existing.id == doc_ids[1]
+
+    # Empty input is a no-op
+    assert await storage.insert_documents([], generation_id) == []
+
+
+@pytest.mark.usefixtures("test_db")
+@pytest.mark.asyncio
+async def test_transaction_groups_storage_calls():
+    """Test storage calls inside transaction() share one commit or rollback."""
+    generation_id = uuid4()
+
+    async with storage.transaction():
+        doc_id = await storage.insert_document(
+            domain="tx.dev",
+            url="https://tx.dev/doc",
+            path="/doc",
+            content_hash=_DOC_HASH,
+            generation_id=generation_id,
+        )
+        # Writes are visible to later calls in the same transaction
+        doc = await storage.get_document_by_url("https://tx.dev/doc", active_only=False)
+        assert doc is not None
+        assert doc.id == doc_id
+
+        section_tree = SectionData(heading="Doc", level=1, content="# Doc", children=[])
+        await storage.insert_sections(flatten_section_tree(section_tree, doc_id))
+
+    await storage.activate_generation("tx.dev", generation_id)
+    assert len(await storage.get_sections_by_document("tx.dev", "/doc")) == 1
+
+    # An exception inside the block rolls back every call in it
+    with pytest.raises(RuntimeError):
+        async with storage.transaction():
+            await storage.insert_document(
+                domain="tx.dev",
+                url="https://tx.dev/rolled-back",
+                path="/rolled-back",
+                content_hash=_hash("rolled-back"),
+                generation_id=generation_id,
+            )
+            raise RuntimeError("abort")
+
+    assert await storage.get_document_by_url("https://tx.dev/rolled-back", active_only=False) is None
+
+    # A failing nested block rolls back only its own writes
+    async with storage.transaction():
+        await storage.insert_document(
+            domain="tx.dev",
+            url="https://tx.dev/outer",
+            path="/outer",
+            content_hash=_hash("outer"),
+            generation_id=generation_id,
+        )
+        with pytest.raises(RuntimeError):
+            async with storage.transaction():
+                await storage.insert_document(
+                    domain="tx.dev",
+                    url="https://tx.dev/inner",
+                    path="/inner",
+                    content_hash=_hash("inner"),
+                    generation_id=generation_id,
+                )
+                raise RuntimeError("abort")
+
+    assert await storage.get_document_by_url("https://tx.dev/outer", active_only=False) is not None
+    assert await storage.get_document_by_url("https://tx.dev/inner", active_only=False) is None
+
+
 @pytest.mark.usefixtures("test_db")
 @pytest.mark.asyncio
 async def test_activate_generation():
@@ -148,7 +326,7 @@ async def test_activate_generation():
         domain="example.com",
         url="https://example.com/doc",
         path="/doc",
-        content_hash=_hash("content"),
+        content_hash=_CONTENT_HASH,
         generation_id=generation_id,
     )
 
@@ -177,7 +355,7 @@ async def test_activate_generation_deactivates_old():
         domain="example.com",
         url="https://example.com/doc1",
         path="/doc1",
-        content_hash=_hash("v1"),
+        content_hash=_V1_HASH,
         generation_id=gen1,
     )
     await storage.activate_generation("example.com", gen1)
@@ -190,15 +368,19 @@ async def test_activate_generation_deactivates_old():
         domain="example.com",
         url="https://example.com/doc2",
         path="/doc2",
-        content_hash=_hash("v2"),
+        content_hash=_V2_HASH,
         generation_id=gen2,
     )
-    await storage.activate_generation("example.com", gen2)
+    # Only the new generation's document counts as activated
+    assert await storage.activate_generation("example.com", gen2) == 1
 
     # Now first doc is inactive, second is active
     assert await storage.get_document_by_url("https://example.com/doc1", active_only=True) is None
     assert await storage.get_document_by_url("https://example.com/doc2", active_only=True) is not None
 
+    # Re-activating the live generation changes nothing
+    assert await storage.activate_generation("example.com", gen2) == 0
+
 
 @pytest.mark.usefixtures("test_db")
 @pytest.mark.asyncio
@@ -241,6 +423,37 @@ async def test_cleanup_old_generations():
     assert await storage.get_document_by_url("https://example.com/new", active_only=True) is not None
 
 
+@pytest.mark.usefixtures("test_db")
+@pytest.mark.asyncio
+async def test_get_document_by_url_multiple_generations():
+    """Test a URL present in several generations resolves to the active one."""
+    gen1 = uuid4()
+    gen2 = uuid4()
+    url = "https://example.com/recrawled"
+
+    active_id = await storage.insert_document(
+        domain="example.com",
+        url=url,
+        path="/recrawled",
+        content_hash=_V1_HASH,
+        generation_id=gen1,
+    )
+    await storage.activate_generation("example.com", gen1)
+
+    # A recrawl inserts the same URL again before its generation is activated
+    await storage.insert_document(
+        domain="example.com",
+        url=url,
+        path="/recrawled",
+        content_hash=_V2_HASH,
+        generation_id=gen2,
+    )
+
+    doc = await storage.get_document_by_url(url, active_only=False)
+    assert doc is not None
+    assert doc.id == active_id
+
+
 @pytest.mark.usefixtures("test_db")
 @pytest.mark.asyncio
 async def test_get_document_by_url_not_found():
@@ -259,7 +472,7 @@ async def test_save_and_get_sections():
         domain="llmstext.org",
         url="https://llmstext.org/hooks",
         path="/hooks",
-        content_hash=_hash("hooks"),
+        content_hash=_HOOKS_HASH,
         generation_id=generation_id,
     )
     await storage.activate_generation("llmstext.org", generation_id)
@@ -299,6 +512,45 @@ async def test_save_and_get_sections():
     assert retrieved[1].heading == "useState"
     assert retrieved[2].heading == "useEffect"
 
+    # Outline-only retrieval keeps the tree but skips content
+    outline = await storage.get_sections_by_document("llmstext.org", "/hooks", with_content=False)
+    assert [s.heading for s in outline] == [None, "useState", "useEffect"]
+    assert outline[1].parent_section_id == outline[0].id
+    assert "content" not in outline[1].__dict__
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        pytest.param(b"Lorem ipsum dolor sit amet. " * 5000, id="large"),
+        pytest.param("# Hooks\n\nLes hooks permettent... émojis: 🎉 汉字".encode(), id="unicode"),
+    ],
+)
+@pytest.mark.usefixtures("test_db")
+@pytest.mark.asyncio
+async def test_section_content_roundtrip(body):
+    """Test a body hashes as raw UTF-8 bytes and its section round-trips as text."""
+    generation_id = uuid4()
+    doc_id = await storage.insert_document(
+        domain="llmstext.org",
+        url="https://llmstext.org/page",
+        path="/page",
+        content_hash=_hash(body),
+        generation_id=generation_id,
+    )
+    await storage.activate_generation("llmstext.org", generation_id)
+
+    content = body.decode()
+    section_tree = SectionData(heading="Page", level=1, content=content, children=[])
+    await storage.insert_sections(flatten_section_tree(section_tree, doc_id))
+
+    doc = await storage.get_document_by_url("https://llmstext.org/page")
+    assert doc.content_hash == _hash(content)
+
+    retrieved = await storage.get_sections_by_document("llmstext.org", "/page")
+    assert len(retrieved) == 1
+    assert retrieved[0].content == content
+
 
 @pytest.mark.usefixtures("test_db")
 @pytest.mark.asyncio
@@ -310,7 +562,7 @@ async def test_search_sections_fts():
         domain="llmstext.org",
         url="https://llmstext.org/hooks",
         path="/hooks",
-        content_hash=_hash("hooks"),
+        content_hash=_HOOKS_HASH,
         generation_id=generation_id,
     )
     await storage.activate_generation("llmstext.org", generation_id)
@@ -366,7 +618,7 @@ async def test_search_sections_fts_inactive_not_found():
         domain="test.dev",
         url="https://test.dev/doc",
         path="/doc",
-        content_hash=_hash("doc"),
+        content_hash=_DOC_HASH,
         generation_id=generation_id,
     )
     # NOT activating the generation
@@ -387,46 +639,60 @@ async def test_search_sections_fts_inactive_not_found():
 
 @pytest.mark.usefixtures("test_db")
 @pytest.mark.asyncio
-async def test_delete_documents_by_domain():
-    """Test deleting all documents for a domain."""
+async def test_delete_documents_by_domain(monkeypatch):
+    """Test deleting purges all of a domain's documents in batches, active or not."""
     gen1 = uuid4()
     gen2 = uuid4()
 
     # Insert documents for multiple domains
-    await storage.insert_document(
-        domain="llmstext.org",
-        url="https://llmstext.org/doc1",
-        path="/doc1",
-        content_hash=_hash("r1"),
-        generation_id=gen1,
-    )
-    await storage.insert_document(
-        domain="llmstext.org",
-        url="https://llmstext.org/doc2",
-        path="/doc2",
-        content_hash=_hash("r2"),
-        generation_id=gen1,
+    await storage.insert_documents(
+        [
+            DocumentRecord(
+                domain="llmstext.org",
+                url=f"https://llmstext.org/{name}",
+                path=f"/{name}",
+                content_hash=_hash(content),
+            )
+            for name, content in [("doc1", "r1"), ("doc2", "r2")]
+        ],
+        gen1,
     )
     await storage.insert_document(
         domain="vue.js.org",
         url="https://vue.js.org/doc1",
         path="/doc1",
-        content_hash=_hash("v1"),
+        content_hash=_V1_HASH,
         generation_id=gen2,
     )
+    await storage.activate_generation("llmstext.org", gen1)
+    await storage.activate_generation("vue.js.org", gen2)
+
+    # A staged document from an unfinished crawl is deleted and counted too
+    await storage.insert_document(
+        domain="llmstext.org",
+        url="https://llmstext.org/doc3",
+        path="/doc3",
+        content_hash=_hash("r3"),
+        generation_id=uuid4(),
+    )
 
-    # Delete llmstext.org documents
+    # Delete llmstext.org documents, one document per batch
+    monkeypatch.setattr(storage, "CLEANUP_BATCH_SIZE", 1)
     count = await storage.delete_documents_by_domain("llmstext.org")
-    assert count == 2
+    assert count == 3
+
+    # Verify llmstext.org docs are no longer visible
+    assert await storage.get_document_by_url("https://llmstext.org/doc1") is None
+    assert await storage.get_document_by_url("https://llmstext.org/doc2") is None
+    assert not await storage.has_active_documents("llmstext.org")
 
-    # Verify llmstext.org docs are gone
-    doc1 = await storage.get_document_by_url("https://llmstext.org/doc1", active_only=False)
-    doc2 = await storage.get_document_by_url("https://llmstext.org/doc2", active_only=False)
-    assert doc1 is None
-    assert doc2 is None
+    # The rows are physically gone too, leaving nothing for a later cleanup
+    for name in ("doc1", "doc2", "doc3"):
+        assert await storage.get_document_by_url(f"https://llmstext.org/{name}", active_only=False) is None
+    assert await storage.cleanup_old_generations("llmstext.org") == 0
 
-    # Verify vue.js.org doc still exists
-    vue_doc = await storage.get_document_by_url("https://vue.js.org/doc1", active_only=False)
+    # Verify vue.js.org doc is untouched
+    vue_doc = await storage.get_document_by_url("https://vue.js.org/doc1")
     assert vue_doc is not None
 
 
@@ -444,37 +710,17 @@ async def test_delete_documents_by_domain_none_exist():
 
 
 @pytest.mark.asyncio
-async def test_migration_schema_matches_models(test_db):
+async def test_migration_schema_matches_models(schema_snapshot):
     """Verify that migrations create the schema matching our models."""
-    from sqlalchemy import inspect
-
-    async with test_db.connect() as conn:
-        # Get inspector in sync context
-        def get_tables(connection):
-            inspector = inspect(connection)
-            return inspector.get_table_names()
-
-        tables = await conn.run_sync(get_tables)
+    tables = schema_snapshot["tables"]
 
     # Check all expected tables exist
     expected_tables = {"queries", "ratings", "documents", "sections", "alembic_version"}
-    assert set(tables) == expected_tables
+    assert tables == expected_tables
 
 
-@pytest.mark.asyncio
-async def test_migration_queries_columns(test_db):
-    """Verify queries table has all expected columns."""
-    from sqlalchemy import inspect
-
-    async with test_db.connect() as conn:
-
-        def get_columns(connection):
-            inspector = inspect(connection)
-            return {col["name"] for col in inspector.get_columns("queries")}
-
-        columns = await conn.run_sync(get_columns)
-
-    expected_columns = {
+_QUERIES_COLUMNS = frozenset(
+    {
         "id",
         "query",
         "language",
@@ -487,23 +733,10 @@ async def test_migration_queries_columns(test_db):
         "inserted_at",
         "updated_at",
     }
-    assert columns == expected_columns
-
-
-@pytest.mark.asyncio
-async def test_migration_ratings_columns(test_db):
-    """Verify ratings table has all expected columns."""
-    from sqlalchemy import inspect
-
-    async with test_db.connect() as conn:
-
-        def get_columns(connection):
-            inspector = inspect(connection)
-            return {col["name"] for col in inspector.get_columns("ratings")}
+)
 
-        columns = await conn.run_sync(get_columns)
-
-    expected_columns = {
+_RATINGS_COLUMNS = frozenset(
+    {
         "id",
         "query_id",
         "correctness",
@@ -516,24 +749,11 @@ async def test_migration_ratings_columns(test_db):
         "inserted_at",
         "updated_at",
     }
-    assert columns == expected_columns
-
-
-@pytest.mark.asyncio
-async def test_migration_documents_columns(test_db):
-    """Verify documents table has expected columns with generation support."""
-    from sqlalchemy import inspect
-
-    async with test_db.connect() as conn:
+)
 
-        def get_columns(connection):
-            inspector = inspect(connection)
-            return {col["name"] for col in inspector.get_columns("documents")}
-
-        columns = await conn.run_sync(get_columns)
-
-    # Document is a container with generation-based visibility
-    expected_columns = {
+# Document is a container with generation-based visibility
+_DOCUMENTS_COLUMNS = frozenset(
+    {
         "id",
         "domain",
         "url",
@@ -545,23 +765,10 @@ async def test_migration_documents_columns(test_db):
         "inserted_at",
         "updated_at",
     }
-    assert columns == expected_columns
-
-
-@pytest.mark.asyncio
-async def test_migration_sections_columns(test_db):
-    """Verify sections table has all expected columns."""
-    from sqlalchemy import inspect
-
-    async with test_db.connect() as conn:
-
-        def get_columns(connection):
-            inspector = inspect(connection)
-            return {col["name"] for col in inspector.get_columns("sections")}
+)
 
-        columns = await conn.run_sync(get_columns)
-
-    expected_columns = {
+_SECTIONS_COLUMNS = frozenset(
+    {
         "id",
         "document_id",
         "parent_section_id",
@@ -574,41 +781,47 @@ async def test_migration_sections_columns(test_db):
         "inserted_at",
         "updated_at",
     }
-    assert columns == expected_columns
+)
+
+
+@pytest.mark.parametrize(
+    ("table", "expected_columns"),
+    [
+        ("queries", _QUERIES_COLUMNS),
+        ("ratings", _RATINGS_COLUMNS),
+        ("documents", _DOCUMENTS_COLUMNS),
+        ("sections", _SECTIONS_COLUMNS),
+    ],
+)
+@pytest.mark.asyncio
+async def test_migration_table_columns(schema_snapshot, table, expected_columns):
+    """Verify each table has all expected columns."""
+    assert schema_snapshot["columns"][table] == expected_columns
 
 
 @pytest.mark.asyncio
-async def test_migration_sections_fts_index(test_db):
+async def test_migration_sections_fts_index(schema_snapshot):
     """Verify sections table has FTS index."""
-    from sqlalchemy import inspect
-
-    async with test_db.connect() as conn:
-
-        def get_indexes(connection):
-            inspector = inspect(connection)
-            return {idx["name"] for idx in inspector.get_indexes("sections")}
-
-        indexes = await conn.run_sync(get_indexes)
+    indexes = schema_snapshot["indexes"]["sections"]
 
     assert "ix_sections_content_tsvector" in indexes
 
 
 @pytest.mark.asyncio
-async def test_migration_documents_domain_index(test_db):
-    """Verify documents table has domain index and active partial indexes."""
-    from sqlalchemy import inspect
+async def test_migration_queries_fts_index(schema_snapshot):
+    """Verify queries table has FTS index backing search_queries."""
+    indexes = schema_snapshot["indexes"]["queries"]
 
-    async with test_db.connect() as conn:
+    assert "ix_queries_query_tsvector" in indexes
 
-        def get_indexes(connection):
-            inspector = inspect(connection)
-            return {idx["name"] for idx in inspector.get_indexes("documents")}
 
-        indexes = await conn.run_sync(get_indexes)
+@pytest.mark.asyncio
+async def test_migration_documents_domain_index(schema_snapshot):
+    """Verify documents table has domain index and active partial index."""
+    indexes = schema_snapshot["indexes"]["documents"]
 
     assert "ix_documents_domain" in indexes
-    # Note: Partial indexes (idx_documents_domain_active, idx_documents_domain_path_active)
-    # were planned but not yet implemented in the migration
+    assert "idx_documents_domain_path_active" in indexes
 
 
 @pytest.mark.asyncio
@@ -650,41 +863,6 @@ async def test_migration_ratings_check_constraints(test_db):
 # =============================================================================
 
 
-@pytest.mark.usefixtures("test_db")
-@pytest.mark.asyncio
-async def test_save_query_with_all_optional_fields():
-    """Test saving a query with all optional fields populated."""
-    query_id = await storage.save_query(
-        query="How to use TypeScript generics?",
-        output="# Generics\n\nGeneric types allow...",
-        messages=[{"role": "assistant", "content": "Let me explain..."}],
-        language="typescript",
-        library="typescript",
-        version="5.0",
-    )
-
-    retrieved = await storage.get_query(query_id)
-    assert retrieved is not None
-    assert retrieved.language == "typescript"
-    assert retrieved.library == "typescript"
-    assert retrieved.version == "5.0"
-
-
-@pytest.mark.usefixtures("test_db")
-@pytest.mark.asyncio
-async def test_save_query_unicode_content():
-    """Test saving queries with unicode characters."""
-    query = "Comment utiliser les hooks React? 你好 🚀"
-    output = "# React Hooks\n\nLes hooks permettent... émojis: 🎉 汉字"
-
-    query_id = await storage.save_query(query=query, output=output)
-
-    retrieved = await storage.get_query(query_id)
-    assert retrieved is not None
-    assert retrieved.query == query
-    assert retrieved.output == output
-
-
 @pytest.mark.usefixtures("test_db")
 @pytest.mark.asyncio
 async def test_search_queries_case_insensitive():
@@ -731,9 +909,8 @@ async def test_search_queries_fts_word_match():
 @pytest.mark.asyncio
 async def test_search_queries_respects_limit():
     """Test that search limit is respected."""
-    # Insert many queries
-    for i in range(10):
-        await storage.save_query(query=f"React question {i}", output=f"Answer {i}")
+    # Insert many queries in one statement
+    await storage.save_queries([QueryContent(query=f"React question {i}", output=f"Answer {i}") for i in range(10)])
 
     # Verify limit works
     results = await storage.search_queries("React", limit=3)
@@ -747,8 +924,6 @@ async def test_search_queries_respects_limit():
 @pytest.mark.asyncio
 async def test_document_url_uniqueness():
     """Test that document URLs are unique within a generation."""
-    import sqlalchemy.exc
-
     url = "https://unique.com/doc"
     generation_id = uuid4()
 
@@ -757,20 +932,25 @@ async def test_document_url_uniqueness():
         domain="unique.com",
         url=url,
         path="/doc",
-        content_hash=_hash("Version 1"),
+        content_hash=_VERSION_1_HASH,
         generation_id=generation_id,
     )
     assert doc_id1 is not None
 
-    # Inserting same URL again should fail (unique constraint)
-    with pytest.raises(sqlalchemy.exc.IntegrityError):
-        await storage.insert_document(
-            domain="unique.com",
-            url=url,
-            path="/doc",
-            content_hash=_hash("Version 2"),
-            generation_id=generation_id,
-        )
+    # Inserting same URL again is skipped (ON CONFLICT DO NOTHING)
+    doc_id2 = await storage.insert_document(
+        domain="unique.com",
+        url=url,
+        path="/doc",
+        content_hash=_hash("Version 2"),
+        generation_id=generation_id,
+    )
+    assert doc_id2 is None
+
+    # The original row is untouched
+    doc = await storage.get_document_by_url(url)
+    assert doc.id == doc_id1
+    assert doc.content_hash == _VERSION_1_HASH
 
 
 @pytest.mark.usefixtures("test_db")
@@ -779,11 +959,9 @@ async def test_save_rating_foreign_key_constraint():
     """Test that rating requires valid query_id."""
     import sqlalchemy.exc
 
-    fake_query_id = UUID("11111111-1111-1111-1111-111111111111")
-
     # Should fail due to foreign key constraint
     rating = Rating(
-        query_id=fake_query_id,
+        query_id=_FAKE_QUERY_ID,
         correctness=3,
         relevance=3,
         usefulness=3,
@@ -1,20 +1,19 @@
 """Tests for tome service layer."""
 
-import hashlib
 from uuid import uuid4
 
 import pytest
 
 from sensei.database import storage
 from sensei.tome.chunker import chunk_markdown
-from sensei.tome.crawler import flatten_section_tree
+from sensei.tome.crawler import content_hash, flatten_section_tree
 from sensei.tome.service import tome_get, tome_search
 from sensei.types import NoResults, SearchResult, Success, ToolError
 
 
-def _hash(content: str) -> str:
+def _hash(content: str) -> bytes:
     """Generate content hash for testing."""
-    return hashlib.sha256(content.encode()).hexdigest()[:16]
+    return content_hash(content.encode())
 
 
 @pytest.fixture
@@ -129,20 +128,17 @@ async def test_tome_search_finds_matching_content(sample_docs):
 
 @pytest.mark.asyncio
 async def test_tome_search_with_path_filter(sample_docs):
-    """Test search respects path prefix filter."""
+    """Test empty paths searches all documents and a path prefix narrows that set."""
+    all_results = await tome_search("llmstext.org", "React", paths=[])
+    assert isinstance(all_results, Success)
+    # Should find multiple docs mentioning React
+    assert len(all_results.data) >= 1
+
     result = await tome_search("llmstext.org", "React", paths=["/hooks"])
     assert isinstance(result, Success)
-    # Should only find docs under /hooks
+    # Should only find docs under /hooks: exactly the /hooks part of the unfiltered search
     assert all("/hooks" in r.path for r in result.data)
-
-
-@pytest.mark.asyncio
-async def test_tome_search_empty_paths_searches_all(sample_docs):
-    """Test empty paths list searches all documents."""
-    result = await tome_search("llmstext.org", "React", paths=[])
-    assert isinstance(result, Success)
-    # Should find multiple docs mentioning React
-    assert len(result.data) >= 1
+    assert {r.path for r in result.data} == {r.path for r in all_results.data if r.path.startswith("/hooks")}
 
 
 @pytest.mark.asyncio